@@ -1,3 +1,9 @@
+from array import array
+from collections import deque
+from itertools import islice
+from operator import lt
+from typing import Dict, Iterable, Iterator
+
 with open('input_data.txt', 'r') as infile:
     readings: list = infile.readlines()
 
@@ -29,3 +35,85 @@ def get_sliding_increased_reading_count(readings: list) -> int:
     return _get_increasing_reading_count(readings, 4)
 
 print(get_sliding_increased_reading_count(readings))
+
+
+def stream_readings(infile_path: str) -> Iterator[int]:
+    """Lazily yield readings from the given file, one line at a time."""
+    with open(infile_path, 'r') as infile:
+        yield from map(int, infile)
+
+
+def _check_step(step: int) -> None:
+    """Raise a ValueError unless the step compares distinct readings."""
+    if step < 1:
+        raise ValueError(f'Step must be at least 1, not {step}')
+
+
+def stream_increasing_reading_counts(
+        readings: Iterable,
+        step: int=1,
+) -> Iterator[int]:
+    """
+    Yield a running count of the number of increased readings.
+
+    Accepts any iterable of readings, only holding the last `step` of them in
+    a ring buffer, so memory use is constant regardless of input length.
+    The step is checked when called, rather than on first iteration.
+    """
+    _check_step(step)
+    return _stream_increasing_reading_counts(readings, step)
+
+
+def _stream_increasing_reading_counts(
+        readings: Iterable,
+        step: int,
+) -> Iterator[int]:
+    """Yield a running count of increased readings from a ring buffer."""
+    window: deque = deque(maxlen=step)
+    increased_readings: int = 0
+    for reading in readings:
+        reading = int(reading)
+        if len(window) == step:
+            if window[0] < reading:
+                increased_readings += 1
+            yield increased_readings
+        window.append(reading)
+
+
+def get_streamed_increasing_reading_count(
+        readings: Iterable,
+        step: int=1,
+) -> int:
+    """Return the final count of increased readings from a stream."""
+    increased_readings: int = 0
+    for increased_readings in stream_increasing_reading_counts(readings, step):
+        pass
+    return increased_readings
+
+
+def parse_readings(readings: Iterable) -> array:
+    """Parse readings once into a typed integer array."""
+    return array('q', map(int, readings))
+
+
+def get_increased_reading_counts(
+        readings: Iterable,
+        steps: Iterable[int],
+) -> Dict[int, int]:
+    """
+    Return a count of the number of increased readings for each step.
+
+    Readings are parsed a single time, after which every step is answered by
+    comparing the array against an offset view of itself, without copies.
+    """
+    steps = list(steps)
+    for step in steps:
+        _check_step(step)
+    parsed: array = (
+        readings if isinstance(readings, array) else parse_readings(readings)
+    )
+    increased_readings: Dict[int, int] = {
+        step: sum(map(lt, parsed, islice(parsed, step, None)))
+        for step in steps
+    }
+    return increased_readings
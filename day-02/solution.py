@@ -1,4 +1,9 @@
-from typing import Tuple
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from itertools import accumulate, repeat
+from operator import mul
+from typing import List, Optional, Tuple
 
 
 class Navigator:
@@ -15,6 +20,14 @@ class Navigator:
         'up': 'aim',
         'down': 'aim',
     }
+    # Compiled movements are encoded as small ints indexing the tuples below
+    DIRECTION_CODE_MAP: dict = {
+        'forward': 0,
+        'up': 1,
+        'down': 2,
+    }
+    FORWARD_ADJUSTMENTS: tuple = (1, 0, 0)
+    AIM_ADJUSTMENTS: tuple = (0, -1, 1)
 
     def __init__(
             self,
@@ -31,6 +44,7 @@ class Navigator:
             'horizontal': start_horizontal,
             'aim': start_aim,
         }
+        self.start_values: dict = dict(self.net_values)
 
     def get_final_postion(self) -> Tuple[int, int]:
         """Apply movements to the depth and horizontal values."""
@@ -42,6 +56,33 @@ class Navigator:
                 self._handle_depth(value)
         return self.net_values['depth'], self.net_values['horizontal']
 
+    @cached_property
+    def compiled_movements(self) -> Tuple[array, array]:
+        """Parse the movements in bulk to direction code and value arrays."""
+        # Split the whole text once, directions and values then alternate
+        tokens: list = ''.join(self.movements).split()
+        codes: array = array('b', map(self.DIRECTION_CODE_MAP.__getitem__, tokens[0::2]))
+        return codes, array('q', map(int, tokens[1::2]))
+
+    def get_compiled_final_position(self) -> Tuple[int, int]:
+        """
+        Calculate the final depth and horizontal values from compiled movements.
+
+        Unlike get_final_postion, the instance's net values are left untouched.
+        """
+        transform: tuple = _compose_movements(*self.compiled_movements)
+        horizontal, depth, _ = _apply_transform(self._start_state, transform)
+        return depth, horizontal
+
+    @property
+    def _start_state(self) -> Tuple[int, int, int]:
+        """Get the starting (horizontal, depth, aim) state."""
+        return (
+            self.start_values['horizontal'],
+            self.start_values['depth'],
+            self.start_values['aim'],
+        )
+
     def _handle_horizontal(self, direction: str, value: int):
         """Apply the horizontal / aim adjustment."""
         direction_dimension: str = self.DIRECTION_MAP[direction]
@@ -56,5 +97,126 @@ class Navigator:
         self.net_values['depth'] += depth_increase
 
 
-depth, horizontal = Navigator('input_data.txt').get_final_postion()
-print(depth * horizontal)
+class ParallelNavigator(Navigator):
+
+    """
+    Navigator reducing chunks of movements in a process pool.
+
+    Every movement is an affine update on (horizontal, depth, aim), so a run
+    of movements composes to a single (horizontal, depth, aim) transform
+    regardless of grouping. Chunks are reduced to one transform per
+    checkpoint interval in parallel, then applied in order to build a sparse
+    index of states from which any intermediate position can be replayed.
+    """
+
+    CHUNK_SIZE = 1_000_000
+    CHECKPOINT_INTERVAL = 10_000
+
+    def __init__(
+            self,
+            infile_location: str,
+            start_depth: int=0,
+            start_horizontal: int=0,
+            start_aim: int=0,
+            chunk_size: int=CHUNK_SIZE,
+            checkpoint_interval: int=CHECKPOINT_INTERVAL,
+            max_workers: Optional[int]=None,
+    ):
+        """Set the the instance variables."""
+        super().__init__(infile_location, start_depth, start_horizontal, start_aim)
+        # Chunks are whole multiples of the interval so checkpoints line up
+        intervals_per_chunk: int = max(chunk_size // checkpoint_interval, 1)
+        self.chunk_size: int = intervals_per_chunk * checkpoint_interval
+        self.checkpoint_interval: int = checkpoint_interval
+        self.max_workers: Optional[int] = max_workers
+
+    @cached_property
+    def checkpoints(self) -> List[Tuple[int, int, int]]:
+        """Get the (horizontal, depth, aim) state every checkpoint interval."""
+        codes, values = self.compiled_movements
+        starts: range = range(0, len(codes), self.chunk_size)
+        code_chunks: list = [codes[i:i + self.chunk_size] for i in starts]
+        value_chunks: list = [values[i:i + self.chunk_size] for i in starts]
+        intervals: repeat = repeat(self.checkpoint_interval)
+        if len(code_chunks) > 1:
+            with ProcessPoolExecutor(self.max_workers) as executor:
+                chunk_transforms: list = list(executor.map(
+                    _compose_chunk, code_chunks, value_chunks, intervals
+                ))
+        else:
+            chunk_transforms = list(map(
+                _compose_chunk, code_chunks, value_chunks, intervals
+            ))
+        state: Tuple[int, int, int] = self._start_state
+        checkpoints: List[Tuple[int, int, int]] = [state]
+        for transforms in chunk_transforms:
+            for transform in transforms:
+                state = _apply_transform(state, transform)
+                checkpoints.append(state)
+        return checkpoints
+
+    def get_position_after(self, step: int) -> Tuple[int, int]:
+        """Get the depth and horizontal values after the given step."""
+        codes, values = self.compiled_movements
+        if not 0 <= step <= len(codes):
+            raise IndexError(f'No movement {step} in {len(codes)} movements')
+        checkpoint_index: int = step // self.checkpoint_interval
+        state: Tuple[int, int, int] = self.checkpoints[checkpoint_index]
+        replay_from: int = checkpoint_index * self.checkpoint_interval
+        transform: tuple = _compose_movements(
+            codes[replay_from:step],
+            values[replay_from:step],
+        )
+        horizontal, depth, _ = _apply_transform(state, transform)
+        return depth, horizontal
+
+    def get_parallel_final_position(self) -> Tuple[int, int]:
+        """Get the final depth and horizontal values using the checkpoints."""
+        return self.get_position_after(len(self.compiled_movements[0]))
+
+
+def _compose_movements(codes: array, values: array) -> Tuple[int, int, int]:
+    """
+    Reduce compiled movements to a single (horizontal, depth, aim) transform.
+
+    Aim is the running sum of the up / down values, and depth is the dot
+    product of that aim with the forward values.
+    """
+    forward_values: list = list(map(
+        mul, values, map(Navigator.FORWARD_ADJUSTMENTS.__getitem__, codes)
+    ))
+    aim_values = map(mul, values, map(Navigator.AIM_ADJUSTMENTS.__getitem__, codes))
+    aims: list = list(accumulate(aim_values))
+    depth: int = sum(map(mul, aims, forward_values))
+    return sum(forward_values), depth, aims[-1] if aims else 0
+
+
+def _compose_chunk(
+        codes: array,
+        values: array,
+        interval: int,
+) -> List[Tuple[int, int, int]]:
+    """Reduce a chunk of compiled movements to one transform per interval."""
+    return [
+        _compose_movements(codes[i:i + interval], values[i:i + interval])
+        for i in range(0, len(codes), interval)
+    ]
+
+
+def _apply_transform(
+        state: Tuple[int, int, int],
+        transform: Tuple[int, int, int],
+) -> Tuple[int, int, int]:
+    """Apply a (horizontal, depth, aim) transform to a state."""
+    horizontal, depth, aim = state
+    horizontal_change, depth_change, aim_change = transform
+    return (
+        horizontal + horizontal_change,
+        depth + depth_change + aim * horizontal_change,
+        aim + aim_change,
+    )
+
+
+if __name__ == '__main__':
+    depth, horizontal = Navigator('input_data.txt').get_final_postion()
+    print(depth * horizontal)
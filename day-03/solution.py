@@ -1,22 +1,95 @@
+from bisect import bisect_left
 from functools import cached_property
-from statistics import multimode, mode
-from typing import Callable
+from typing import Callable, Iterable, List
 
 
 class DiagnosticReport:
 
     """Class for handling submarine diagnostic data."""
 
+    # Cached properties to be recalculated when new readings arrive
+    GAMMA_DEPENDENTS: tuple = ('gamma_rate', 'epsilon_rate', 'power_consumption')
+    RATING_DEPENDENTS: tuple = (
+        'o2_generator_rating',
+        'co2_scrubber_rating',
+        'life_support_rating',
+    )
+
     def __init__(self, infile_path: str):
         """Read infile and set against instance"""
         with open(infile_path, 'r') as infile:
             self.readings: list = infile.readlines()
 
+    def append(self, reading: str) -> None:
+        """Add a single reading to the report."""
+        self.extend([reading])
+
+    def extend(self, readings: Iterable[str]) -> None:
+        """
+        Add readings to the report, updating cached data in place.
+
+        Column counts and sorted readings are only updated if they have
+        already been calculated. Cached rates are only invalidated if the
+        gamma rate changes, whereas the ratings are always recalculated.
+        """
+        new_readings: List[str] = [reading.strip() for reading in readings]
+        if not new_readings:
+            return
+        for reading in new_readings:
+            if len(reading) != self.width:
+                raise ValueError(f'Reading {reading} is not {self.width} bits')
+        packed: List[int] = [
+            self._binary_string_to_int(reading) for reading in new_readings
+        ]
+        self.readings.extend(new_readings)
+        if self._is_cached('packed_readings'):
+            self.packed_readings.extend(packed)
+        if self._is_cached('column_counts'):
+            for index, bit in enumerate(reversed(range(self.width))):
+                self.column_counts[index] += self._count_set_bits(packed, bit)
+        if self._is_cached('sorted_readings'):
+            # Two sorted runs, which sort merges in linear time
+            self.sorted_readings.extend(sorted(packed))
+            self.sorted_readings.sort()
+        if self._is_cached('gamma_rate'):
+            most_commons: list = [
+                self._most_common_bit(index, count)
+                for index, count in enumerate(self.column_counts)
+            ]
+            if "".join(most_commons) != self.gamma_rate:
+                self._invalidate(self.GAMMA_DEPENDENTS)
+        self._invalidate(self.RATING_DEPENDENTS)
+
+    @cached_property
+    def width(self) -> int:
+        """Get the number of bits in each reading."""
+        return len(self.readings[0].strip())
+
+    @cached_property
+    def packed_readings(self) -> List[int]:
+        """Parse each reading once into an integer."""
+        return [self._binary_string_to_int(reading) for reading in self.readings]
+
+    @cached_property
+    def column_counts(self) -> List[int]:
+        """Count the set bits in each column, most significant first."""
+        return [
+            self._count_set_bits(self.packed_readings, bit)
+            for bit in reversed(range(self.width))
+        ]
+
+    @cached_property
+    def sorted_readings(self) -> List[int]:
+        """Sort the packed readings, so readings sharing a prefix are adjacent."""
+        return sorted(self.packed_readings)
+
     @cached_property
     def gamma_rate(self) -> str:
         """Calculate the gamma rate."""
-        transposed_data: list = self._transpose_data(self.readings)
-        most_commons: list = [mode(column) for column in transposed_data]
+        most_commons: list = [
+            self._most_common_bit(index, count)
+            for index, count in enumerate(self.column_counts)
+        ]
         gamma_rate: str = "".join(most_commons)
         return gamma_rate
 
@@ -41,16 +114,14 @@ class DiagnosticReport:
     @cached_property
     def o2_generator_rating(self) -> str:
         """Calculate the oxygen generator rating."""
-        remaining: list = list(self.readings)
-        rating: str = self._extract_rating(remaining, 0, self._o2_reducer)
-        return rating
+        rating: int = self._extract_rating(self._o2_reducer)
+        return self._int_to_binary_string(rating)
 
     @cached_property
     def co2_scrubber_rating(self) -> str:
         """Calculate the carbon dioxide scrubber rating."""
-        remaining: list = list(self.readings)
-        rating: str = self._extract_rating(remaining, 0, self._co2_reducer)
-        return rating
+        rating: int = self._extract_rating(self._co2_reducer)
+        return self._int_to_binary_string(rating)
 
     @cached_property
     def life_support_rating(self) -> int:
@@ -60,52 +131,68 @@ class DiagnosticReport:
         life_support: int =  o2_gen_int * co2_scrub_int
         return life_support
 
-    def _transpose_data(self, readings: list) -> list:
-        """Transpose a 2D list."""
-        transposed_data: list = list(zip(*readings))
-        return transposed_data
+    def _most_common_bit(self, index: int, set_count: int) -> str:
+        """Get the most common bit of a column from its count of set bits."""
+        unset_count: int = len(self.readings) - set_count
+        if set_count == unset_count:
+            # Ties go to the bit seen first in the column, as with mode
+            return self.readings[0][index]
+        return '1' if set_count > unset_count else '0'
+
+    def _count_set_bits(self, packed_readings: List[int], bit: int) -> int:
+        """Count the readings with the given bit set."""
+        mask: int = 1 << bit
+        return sum(map(mask.__and__, packed_readings)) >> bit
+
+    def _is_cached(self, name: str) -> bool:
+        """Return true if the cached property has been calculated."""
+        return name in self.__dict__
+
+    def _invalidate(self, names: Iterable[str]) -> None:
+        """Drop the given cached properties so they are recalculated."""
+        for name in names:
+            self.__dict__.pop(name, None)
 
     def _binary_string_to_int(self, binary_string: str) -> int:
         """Convert a binary string to its corresponging integer."""
         binary_as_int: int = int(binary_string, 2)
         return binary_as_int
 
-    def _get_column(self, column: int, table: list) -> list:
-        """Extract a column from a 2D list."""
-        return [row[column] for row in table]
-
-    def _extract_rating(
-            self,
-            readings: list,
-            index: int,
-            reducer: Callable
-    ) -> str:
-        """Extract a single rating from a set using a given reducer."""
-        column: list = self._get_column(index, readings)
-        target: str = reducer(column)
-        selected: list = [
-            reading for reading in readings
-            if reading[index] == target
-        ]
-        if len(selected) == 1:
-            return selected[0]
-        else:
-            return self._extract_rating(selected, index + 1, reducer)
-
-    def _o2_reducer(self, column: list) -> str:
+    def _int_to_binary_string(self, binary_int: int) -> str:
+        """Convert an integer to its corresponding binary string."""
+        return format(binary_int, f'0{self.width}b')
+
+    def _extract_rating(self, reducer: Callable) -> int:
+        """
+        Extract a single rating from the readings using a given reducer.
+
+        The remaining readings are always a contiguous range of the sorted
+        readings, within which those with the current bit set follow those
+        without it, so each bit is narrowed with one binary search.
+        """
+        readings: List[int] = self.sorted_readings
+        low, high = 0, len(readings)
+        for bit in reversed(range(self.width)):
+            if high - low == 1:
+                break
+            prefix: int = readings[low] >> (bit + 1) << (bit + 1)
+            split: int = bisect_left(readings, prefix | (1 << bit), low, high)
+            unset_count, set_count = split - low, high - split
+            if not unset_count or not set_count:
+                continue
+            if reducer(unset_count, set_count) == '1':
+                low = split
+            else:
+                high = split
+        return readings[low]
+
+    def _o2_reducer(self, unset_count: int, set_count: int) -> str:
         """"Get the target value for discerning o2 data from readings."""
-        most_common_list: list = multimode(column)
-        most_common: str = max(most_common_list)
-        return most_common
+        return '1' if set_count >= unset_count else '0'
 
-    def _co2_reducer(self, column: list) -> str:
+    def _co2_reducer(self, unset_count: int, set_count: int) -> str:
         """Get the target value for discerning co2 data from readings."""
-        most_common_list: list = multimode(column)
-        if len(most_common_list) == 2:
-            target_val: str = '0'
-        else:
-            target_val: str = '0' if most_common_list[0] == '1' else '1'
-        return target_val
+        return '0' if unset_count <= set_count else '1'
 
 
 report = DiagnosticReport('input_data.txt')
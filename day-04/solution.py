@@ -1,72 +1,61 @@
-from typing import Optional
+from array import array
+from functools import cached_property
+from itertools import repeat
+from typing import Dict, List, Optional
 
 
-class Winnable:
-
-    """Logic encapsulating groups of numbers (i.e. rows or columns)."""
-
-    def __init__(self, items: list, win_at: int = 5):
-        """Set items against the instance."""
-        self.available_numbers = {item for item in items}
-        self.checked_count = 0
-        self.win_at = win_at
-
-    @property
-    def has_won(self) -> bool:
-        """Returns true if all numbers have been checked off."""
-        return self.checked_count == self.win_at
+class Card:
 
-    def handle_number(self, number: int) -> None:
-        """Handle a number checked of the winnable."""
-        if number in self.available_numbers:
-            self.checked_count += 1
-            self.available_numbers.remove(number)
+    """
+    Logic encapsulating a bingo card.
 
-    def get_score(self) -> int:
-        """Get the row or columns's score."""
-        return sum(number for number in self.available_numbers)
+    Numbers are held row by row in a flat array, with the marked cells as
+    bits of a single integer, so lines are checked against precomputed
+    masks rather than tracked individually.
+    """
 
+    __slots__ = ('numbers', 'marked')
 
-class Card:
-
-    """Logic encapsulating a bingo card"""
+    SIZE = 5
+    CELLS = SIZE * SIZE
+    ROW_MASK = (1 << SIZE) - 1
+    COLUMN_MASK = sum(map((1).__lshift__, range(0, CELLS, SIZE)))
+    ROW_MASKS = tuple(map(ROW_MASK.__lshift__, range(0, CELLS, SIZE)))
+    COLUMN_MASKS = tuple(map(COLUMN_MASK.__lshift__, range(SIZE)))
+    LINE_MASKS = ROW_MASKS + COLUMN_MASKS
 
-    def __init__(self, data: list, cols: int = 5):
+    def __init__(self, data: list):
         """Set the number data"""
-        self.items = set()
-        self.lookups = {}
-        self.raw_column_data = [[] for _ in range(cols)]
-        for row_index, row in enumerate(data):
-            self.rows = [Winnable(row) for row in data]
-            for column_index, number in enumerate(row):
-                self.items.add(number)
-                self.lookups.update({
-                    number: {'column': column_index, 'row': row_index}
-                })
-                self.raw_column_data[column_index].append(number)
-        self.columns = [Winnable(column) for column in self.raw_column_data]
+        self.numbers: array = array('i', (number for row in data for number in row))
+        self.marked: int = 0
 
     @property
     def has_won(self) -> bool:
         """Returns if a card has a winning row or column."""
-        return (
-            any([row.has_won for row in self.rows])
-            or any([column.has_won for column in self.columns])
-        )
+        return any(self.marked & mask == mask for mask in self.LINE_MASKS)
 
     def handle_number(self, number: int) -> None:
-        """Check a card has this number and forward to winnables if so."""
-        if number in self.items:
-            lookups: dict = self.lookups[number]
-            column_index, row_index = lookups['column'], lookups['row']
-            column_winnable: Winnable = self.columns[column_index]
-            row_winnable: Winnable = self.rows[row_index]
-            column_winnable.handle_number(number)
-            row_winnable.handle_number(number)
+        """Check a card has this number and mark it if so."""
+        if number in self.numbers:
+            self.mark(self.numbers.index(number))
+
+    def mark(self, cell: int) -> bool:
+        """Mark the given cell, returning true if it completed a line."""
+        self.marked |= 1 << cell
+        row_mask: int = self.ROW_MASKS[cell // self.SIZE]
+        column_mask: int = self.COLUMN_MASKS[cell % self.SIZE]
+        return (
+            self.marked & row_mask == row_mask
+            or self.marked & column_mask == column_mask
+        )
 
     def get_score(self) -> int:
         """Get the card's score."""
-        return sum(row.get_score() for row in self.rows)
+        return sum(
+            number
+            for cell, number in enumerate(self.numbers)
+            if not self.marked >> cell & 1
+        )
 
 
 class BingoGame:
@@ -75,27 +64,30 @@ class BingoGame:
 
     def __init__(self, infile_path: str):
         """Read the game data."""
-        with open(infile_path, 'r') as infile:
-            data: list = infile.readlines()
-        self.numbers = data[0].split(',')
         self.winning_number: Optional[int] = None
         self.winning_card: Optional[Card] = None
         self.last_winning_number: Optional[int] = None
         self.last_winning_card: Optional[Card] = None
-        cards: list = data[2:]
-        start = 0
-        CARD_STEP = 6
-        ROWS_PER_CARD = 5
         self.cards: list = []
-        for i in range(start, len(cards), CARD_STEP):
-            card_data: list = cards[i:i + ROWS_PER_CARD]
-            card_data = [self._extract_row_numbers(row) for row in card_data]
-            self.cards.append(Card(card_data))
+        # Map each number to the cells holding it, in card order, with each
+        # cell stored as card index * Card.CELLS + cell index
+        self.number_index: Dict[int, array] = {}
+        self.won_cards: set = set()
+        with open(infile_path, 'r') as infile:
+            self.numbers = infile.readline().split(',')
+            card_data: list = []
+            for row in infile:
+                row_numbers: list = self._extract_row_numbers(row)
+                if row_numbers:
+                    card_data.append(row_numbers)
+                if len(card_data) == Card.SIZE:
+                    self._add_card(Card(card_data))
+                    card_data = []
 
     @property
     def game_over(self) -> bool:
         """Returns true a card has won."""
-        return any([card.has_won for card in self.cards])
+        return bool(self.won_cards)
 
     def play(self):
         """Play a game of bingo"""
@@ -103,15 +95,67 @@ class BingoGame:
             number: int = int(number_str)
             self._handle_number(number)
 
+    @cached_property
+    def draw_turns(self) -> Dict[int, int]:
+        """Map each drawn number to the turn it is drawn on."""
+        draw_turns: Dict[int, int] = {}
+        for turn, number_str in enumerate(self.numbers):
+            draw_turns.setdefault(int(number_str), turn)
+        return draw_turns
+
+    @cached_property
+    def win_turns(self) -> List[int]:
+        """
+        Calculate the turn each card wins on, without playing the game.
+
+        A line is complete on the latest turn any of its numbers is drawn, and
+        a card wins on the earliest turn any of its lines is complete. Cards
+        that never win are given the turn after the last draw.
+        """
+        return [self._calculate_win_turn(card) for card in self.cards]
+
+    @cached_property
+    def winning_order(self) -> List[int]:
+        """Get the indices of winning cards in the order they win."""
+        never: int = len(self.numbers)
+        winners: List[int] = [
+            index for index, turn in enumerate(self.win_turns) if turn != never
+        ]
+        # Sorting is stable, so cards winning on the same turn stay in order
+        return sorted(winners, key=self.win_turns.__getitem__)
+
     def get_winning_card_score(self) -> int:
         """Get the winning card's score."""
-        winning_card_score: int = self.winning_card.get_score()
-        return winning_card_score * self.winning_number
+        return self.get_kth_winning_card_score(0)
 
     def get_last_winning_card_score(self) -> int:
         """Get the last winning card's score."""
-        last_winning_card_score: int = self.last_winning_card.get_score()
-        return last_winning_card_score * self.last_winning_number
+        return self.get_kth_winning_card_score(-1)
+
+    def get_kth_winning_card_score(self, k: int) -> int:
+        """Get the score of the k-th card to win, counting from zero."""
+        card_index: int = self.winning_order[k]
+        card: Card = self.cards[card_index]
+        win_turn: int = self.win_turns[card_index]
+        unmarked_score: int = sum(
+            number
+            for number in card.numbers
+            if self.draw_turns.get(number, win_turn + 1) > win_turn
+        )
+        return unmarked_score * int(self.numbers[win_turn])
+
+    def _calculate_win_turn(self, card: Card) -> int:
+        """Calculate the turn the given card wins on."""
+        never: int = len(self.numbers)
+        turns: list = list(map(self.draw_turns.get, card.numbers, repeat(never)))
+        row_turns: List[list] = [
+            turns[start:start + Card.SIZE]
+            for start in range(0, Card.CELLS, Card.SIZE)
+        ]
+        column_turns: List[list] = [
+            turns[column::Card.SIZE] for column in range(Card.SIZE)
+        ]
+        return min(map(max, row_turns + column_turns))
 
     def _extract_row_numbers(self, row_string: str) -> list:
         """Extract a list of numbers from a single string of spaced numbers."""
@@ -119,20 +163,31 @@ class BingoGame:
         filtered_list: list = [int(number) for number in number_list if number]
         return filtered_list
 
+    def _add_card(self, card: Card) -> None:
+        """Add a card to the game and index its numbers."""
+        offset: int = len(self.cards) * Card.CELLS
+        self.cards.append(card)
+        for cell, number in enumerate(card.numbers):
+            if number not in self.number_index:
+                self.number_index[number] = array('q')
+            self.number_index[number].append(offset + cell)
+
     def _handle_number(self, number: int) -> None:
-        """Pass the number to the cards"""
-        for card in self.cards:
-            if not card.has_won:
-                card.handle_number(number)
-                if card.has_won:
-                    self.last_winning_card = card
-                    self.last_winning_number = number
-                    if not self.winning_card:
-                        self.winning_card = card
-                        self.winning_number = number
+        """Mark the number on the cards holding it."""
+        for position in self.number_index.get(number, ()):
+            card_index, cell = divmod(position, Card.CELLS)
+            if card_index in self.won_cards:
+                continue
+            card: Card = self.cards[card_index]
+            if card.mark(cell):
+                self.won_cards.add(card_index)
+                self.last_winning_card = card
+                self.last_winning_number = number
+                if not self.winning_card:
+                    self.winning_card = card
+                    self.winning_number = number
 
 
 game = BingoGame('input_data.txt')
-game.play()
 print(game.get_winning_card_score())
 print(game.get_last_winning_card_score())
@@ -9,9 +9,29 @@ published these to the central data structure.
 Whilst initially readability has been prioritised, these series iterations
 could be merged into a single iteration for performance reasons. Range object
 constructions for static points could be removed entirely.
+
+For dense vent fields, the rasterized calculation instead allocates a byte
+per point of the vents' bounding box, and marks each line in one go through
+a strided slice of that grid.
+
+Where the vents' co ordinates are too large for any grid, the swept
+calculation works from the line geometry alone. Collinear lines are merged
+into intervals, and crossings between lines of differing direction are found
+with a sweep line, so its cost grows with the number of lines rather than
+their length.
+
+Vent maps too large for one grid can also be split into square tiles, with
+each line clipped into the tiles it crosses. Tiles are then counted in a
+process pool, each as its own small grid, or as a dict of points where the
+tile is mostly empty.
 """
 
-from typing import Generator, Iterable
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from itertools import combinations, repeat
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
 
 
 class SeaBed:
@@ -20,6 +40,23 @@ class SeaBed:
 
     POINTS_DELIMITER = ' -> '
     CO_ORDS_DELIMITER = ','
+    # Maps a point's coverage to its coverage after one more line, capped at 2
+    COVERAGE_TABLE = bytes([1, 2]) + bytes([2]) * 254
+    TILE_SIZE = 1024
+    # Tiles with fewer plotted points than this share of their area are
+    # counted with a dict of points rather than a grid
+    SPARSE_TILE_DENSITY = 1 / 32
+    # Tiles are sent to the process pool in roughly this many batches
+    TILE_BATCHES = 256
+    # Each family of lines is keyed by the co efficients (a, b) of the value
+    # a * x + b * y which is constant along its lines. Points along a line are
+    # identified by their x co ordinate, or their y for vertical lines.
+    LINE_FAMILIES: Dict[str, Tuple[int, int]] = {
+        'horizontal': (0, 1),
+        'vertical': (1, 0),
+        'diagonal': (1, -1),
+        'anti_diagonal': (1, 1),
+    }
 
     def __init__(self, infile_path: str):
         """Read the vent data."""
@@ -34,6 +71,328 @@ class SeaBed:
             self._plot_line(co_ords)
         return sum(1 for value in self.bed.values() if value > 1)
 
+    @cached_property
+    def lines(self) -> List[tuple]:
+        """Extract the start and end co ordinates of every line."""
+        return [self._extract_data(datum) for datum in self.raw_data]
+
+    def calculate_dangerous_areas_rasterized(self) -> int:
+        """Determine the dangerous areas by rasterizing onto a dense grid."""
+        all_x: List[int] = [x for line in self.lines for x, _ in line]
+        all_y: List[int] = [y for line in self.lines for _, y in line]
+        origin: tuple = (min(all_x), min(all_y))
+        width: int = max(all_x) - origin[0] + 1
+        height: int = max(all_y) - origin[1] + 1
+        grid: bytearray = self._rasterize(self.lines, origin, width, height)
+        return grid.count(2)
+
+    def calculate_dangerous_areas_tiled(
+            self,
+            tile_size: int=TILE_SIZE,
+            max_workers: Optional[int]=None,
+    ) -> int:
+        """Determine the dangerous areas by counting tiles in parallel."""
+        tiles: Dict[tuple, list] = defaultdict(list)
+        for line in self.lines:
+            for tile, clipped_line in self._clip_to_tiles(line, tile_size):
+                tiles[tile].append(clipped_line)
+        origins: list = [
+            (tile_x * tile_size, tile_y * tile_size) for tile_x, tile_y in tiles
+        ]
+        arguments: tuple = (origins, list(tiles.values()), repeat(tile_size))
+        if len(tiles) > 1:
+            chunksize: int = max(len(tiles) // self.TILE_BATCHES, 1)
+            with ProcessPoolExecutor(max_workers) as executor:
+                counts = executor.map(self._count_tile, *arguments, chunksize=chunksize)
+                return sum(counts)
+        return sum(map(self._count_tile, *arguments))
+
+    def _clip_to_tiles(
+            self,
+            co_ords: tuple,
+            tile_size: int,
+    ) -> Generator[Tuple[tuple, tuple], None, None]:
+        """Split a line into the parts within each tile it crosses."""
+        (start_x, start_y), (end_x, end_y) = co_ords
+        step_x: int = (end_x > start_x) - (end_x < start_x)
+        step_y: int = (end_y > start_y) - (end_y < start_y)
+        length: int = max(abs(end_x - start_x), abs(end_y - start_y))
+        steps: int = 0
+        while steps <= length:
+            x, y = start_x + step_x * steps, start_y + step_y * steps
+            tile: tuple = (x // tile_size, y // tile_size)
+            # Steps until the line leaves the tile along either axis
+            last_step: int = length
+            for position, step in ((x, step_x), (y, step_y)):
+                tile_start: int = position // tile_size * tile_size
+                if step > 0:
+                    remaining: int = tile_start + tile_size - 1 - position
+                    last_step = min(last_step, steps + remaining)
+                elif step < 0:
+                    last_step = min(last_step, steps + position - tile_start)
+            end: tuple = (start_x + step_x * last_step, start_y + step_y * last_step)
+            yield tile, ((x, y), end)
+            steps = last_step + 1
+
+    @classmethod
+    def _count_tile(cls, origin: tuple, lines: List[tuple], tile_size: int) -> int:
+        """Count the points in a tile covered by at least two lines."""
+        plotted_points: int = sum(
+            max(abs(end_x - start_x), abs(end_y - start_y)) + 1
+            for (start_x, start_y), (end_x, end_y) in lines
+        )
+        if plotted_points < tile_size * tile_size * cls.SPARSE_TILE_DENSITY:
+            coverage: Counter = Counter()
+            for line in lines:
+                coverage.update(range(*cls._line_to_slice(line, origin, tile_size)))
+            return sum(1 for count in coverage.values() if count > 1)
+        grid: bytearray = cls._rasterize(lines, origin, tile_size, tile_size)
+        return grid.count(2)
+
+    def calculate_dangerous_areas_swept(self) -> int:
+        """Determine the dangerous areas from the line geometry alone."""
+        covered, overlapping = self._group_intervals(self.lines)
+        crossings: set = set()
+        for family, other_family in combinations(self.LINE_FAMILIES, 2):
+            crossings.update(self._sweep_crossings(covered, family, other_family))
+        dangerous_areas: int = sum(
+            end - start + 1
+            for family_intervals in overlapping.values()
+            for intervals in family_intervals.values()
+            for start, end in intervals
+        )
+        # A crossing within n overlaps has already been counted n times
+        for point in crossings:
+            dangerous_areas += 1 - self._count_overlaps_at(point, overlapping)
+        return dangerous_areas
+
+    def _group_intervals(self, lines: Iterable[tuple]) -> Tuple[dict, dict]:
+        """
+        Group lines into covered and overlapping intervals.
+
+        Both are keyed by family, then by the constant identifying a line
+        within the family, and hold sorted, non adjacent intervals.
+        """
+        grouped: Dict[str, dict] = {
+            family: defaultdict(list) for family in self.LINE_FAMILIES
+        }
+        for line in lines:
+            family, key, interval = self._classify_line(line)
+            grouped[family][key].append(interval)
+        covered: Dict[str, dict] = {family: {} for family in self.LINE_FAMILIES}
+        overlapping: Dict[str, dict] = {family: {} for family in self.LINE_FAMILIES}
+        for family, family_intervals in grouped.items():
+            for key, intervals in family_intervals.items():
+                covered[family][key] = self._merge_intervals(intervals)
+                overlaps: list = self._find_overlaps(intervals)
+                if overlaps:
+                    overlapping[family][key] = overlaps
+        return covered, overlapping
+
+    def _classify_line(self, co_ords: tuple) -> Tuple[str, int, tuple]:
+        """Get a line's family, the constant along it and its interval."""
+        (start_x, start_y), (end_x, end_y) = co_ords
+        x_change, y_change = end_x - start_x, end_y - start_y
+        if y_change == 0:
+            family: str = 'horizontal'
+        elif x_change == 0:
+            family = 'vertical'
+        elif x_change == y_change:
+            family = 'diagonal'
+        elif x_change == -y_change:
+            family = 'anti_diagonal'
+        else:
+            raise ValueError(f'Line {co_ords} is not horizontal, vertical or diagonal')
+        coefficients: tuple = self.LINE_FAMILIES[family]
+        key: int = self._evaluate(coefficients, (start_x, start_y))
+        params: list = sorted(
+            self._param_of(coefficients, point)
+            for point in ((start_x, start_y), (end_x, end_y))
+        )
+        return family, key, tuple(params)
+
+    def _merge_intervals(self, intervals: List[tuple]) -> List[tuple]:
+        """Merge intervals into sorted, non adjacent covering intervals."""
+        merged: List[list] = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return [tuple(interval) for interval in merged]
+
+    def _find_overlaps(self, intervals: List[tuple]) -> List[tuple]:
+        """Find the intervals covered by at least two of the given intervals."""
+        events: List[tuple] = sorted(
+            [(start, 1) for start, _ in intervals]
+            + [(end + 1, -1) for _, end in intervals]
+        )
+        overlaps: List[tuple] = []
+        depth: int = 0
+        overlap_start: Optional[int] = None
+        for position, change in events:
+            depth += change
+            if depth >= 2 and overlap_start is None:
+                overlap_start = position
+            elif depth < 2 and overlap_start is not None:
+                overlaps.append((overlap_start, position - 1))
+                overlap_start = None
+        return self._merge_intervals(overlaps)
+
+    def _sweep_crossings(
+            self,
+            covered: dict,
+            family: str,
+            other_family: str,
+    ) -> Generator[tuple, None, None]:
+        """
+        Find the points where lines of two families cross.
+
+        Co ordinates are changed so the first family's lines run along one
+        axis, and the other family's along the other. Sweeping across the
+        first axis, the other family's lines then look up the active lines
+        they span.
+        """
+        coefficients: tuple = self.LINE_FAMILIES[family]
+        other_coefficients: tuple = self.LINE_FAMILIES[other_family]
+        events: List[tuple] = []
+        for key, intervals in covered[family].items():
+            for interval in intervals:
+                low, high = self._project_interval(
+                    coefficients, key, interval, other_coefficients
+                )
+                events.append((low, 0, key))
+                events.append((high, 2, key))
+        for other_key, intervals in covered[other_family].items():
+            for interval in intervals:
+                low, high = self._project_interval(
+                    other_coefficients, other_key, interval, coefficients
+                )
+                events.append((other_key, 1, low, high))
+        # Lines are added before, and removed after, lookups at each position
+        events.sort()
+        active: List[int] = []
+        for event in events:
+            position, kind = event[0], event[1]
+            if kind == 0:
+                insort(active, event[2])
+            elif kind == 2:
+                del active[bisect_left(active, event[2])]
+            else:
+                low_index: int = bisect_left(active, event[2])
+                high_index: int = bisect_right(active, event[3])
+                for key in active[low_index:high_index]:
+                    point: Optional[tuple] = self._solve_crossing(
+                        coefficients, key, other_coefficients, position
+                    )
+                    if point is not None:
+                        yield point
+
+    def _project_interval(
+            self,
+            coefficients: tuple,
+            key: int,
+            interval: tuple,
+            other_coefficients: tuple,
+    ) -> Tuple[int, int]:
+        """Get the range of another family's constant along an interval."""
+        values: list = sorted(
+            self._evaluate(other_coefficients, self._point_on(coefficients, key, param))
+            for param in interval
+        )
+        return values[0], values[1]
+
+    def _count_overlaps_at(self, point: tuple, overlapping: dict) -> int:
+        """Count the families with an overlap covering the given point."""
+        count: int = 0
+        for family, coefficients in self.LINE_FAMILIES.items():
+            key: int = self._evaluate(coefficients, point)
+            intervals: list = overlapping[family].get(key, [])
+            param: int = self._param_of(coefficients, point)
+            index: int = bisect_right(intervals, (param + 1,)) - 1
+            if index >= 0 and intervals[index][1] >= param:
+                count += 1
+        return count
+
+    def _solve_crossing(
+            self,
+            coefficients: tuple,
+            key: int,
+            other_coefficients: tuple,
+            other_key: int,
+    ) -> Optional[tuple]:
+        """Get the point on both lines, if it has integer co ordinates."""
+        a, b = coefficients
+        other_a, other_b = other_coefficients
+        determinant: int = a * other_b - other_a * b
+        x_numerator: int = key * other_b - other_key * b
+        y_numerator: int = a * other_key - other_a * key
+        if x_numerator % determinant or y_numerator % determinant:
+            return None
+        return x_numerator // determinant, y_numerator // determinant
+
+    def _evaluate(self, coefficients: tuple, point: tuple) -> int:
+        """Get the value constant along lines of a family at the point."""
+        a, b = coefficients
+        x, y = point
+        return a * x + b * y
+
+    def _param_of(self, coefficients: tuple, point: tuple) -> int:
+        """Get the position of a point along a line of the family."""
+        x, y = point
+        return y if coefficients[1] == 0 else x
+
+    def _point_on(self, coefficients: tuple, key: int, param: int) -> tuple:
+        """Get the point at the given position along a line of the family."""
+        a, b = coefficients
+        if b == 0:
+            return key, param
+        # b is always 1 or -1, so is its own reciprocal
+        return param, (key - a * param) * b
+
+    @classmethod
+    def _rasterize(
+            cls,
+            lines: Iterable[tuple],
+            origin: tuple,
+            width: int,
+            height: int,
+    ) -> bytearray:
+        """
+        Plot lines onto a grid of the given size, one byte per point.
+
+        Horizontal, vertical and diagonal lines are all evenly strided runs
+        of the row-major grid, so each is marked with a single slice.
+        """
+        grid: bytearray = bytearray(width * height)
+        for line in lines:
+            start, stop, stride = cls._line_to_slice(line, origin, width)
+            grid[start:stop:stride] = grid[start:stop:stride].translate(
+                cls.COVERAGE_TABLE
+            )
+        return grid
+
+    @classmethod
+    def _line_to_slice(
+            cls,
+            co_ords: tuple,
+            origin: tuple,
+            width: int,
+    ) -> Tuple[int, int, int]:
+        """Convert a line to the start, stop and stride of a grid slice."""
+        (start_x, start_y), (end_x, end_y) = co_ords
+        origin_x, origin_y = origin
+        start: int = (start_y - origin_y) * width + start_x - origin_x
+        end: int = (end_y - origin_y) * width + end_x - origin_x
+        if start > end:
+            start, end = end, start
+            (start_x, start_y), (end_x, end_y) = (end_x, end_y), (start_x, start_y)
+        if start == end:
+            return start, end + 1, 1
+        step_x: int = (end_x > start_x) - (end_x < start_x)
+        step_y: int = (end_y > start_y) - (end_y < start_y)
+        return start, end + 1, step_y * width + step_x
+
     def _extract_data(self, row: str) -> tuple:
         """Extract the vector data to co ordinate tuples."""
         co_ord_strings: list = row.strip().split(self.POINTS_DELIMITER)
@@ -96,4 +455,5 @@ class SeaBed:
             self.bed[co_ords] += 1
 
 
-print(SeaBed('input_data.txt').calculate_dangerous_areas())
+if __name__ == '__main__':
+    print(SeaBed('input_data.txt').calculate_dangerous_areas())
@@ -1,4 +1,6 @@
-from typing import Dict, List
+from functools import lru_cache
+from operator import mul
+from typing import Dict, Iterable, List, Optional, Sequence
 
 
 class SeaBed:
@@ -13,11 +15,115 @@ class SeaBed:
         self.day: int = 0
         self.total_fishes: int = 0
         self.birthing_plan: Dict[int, int] = {}
+        # Count of fishes by days until they next give birth
+        self.initial_state: List[int] = [0] * self.NEWBORN_GESTATION_PERIOD
         with open(infile_path, 'r') as infile:
             raw_data: list = infile.readlines()
             data: list = raw_data[0].split(',')
             for fish in data:
                 self._handle_newborns(1, int(fish))
+                self.initial_state[int(fish)] += 1
+
+    def project_fishes(self, days: int, modulus: Optional[int] = None) -> int:
+        """
+        Get the number of fishes after the given number of days, in log time.
+
+        The population's state advances a day by multiplication with a fixed
+        transition matrix, so the state after any number of days comes from
+        the matrix raised to that power by repeated squaring. A modulus keeps
+        the numbers bounded for very long projections.
+        """
+        return self.query_fishes([self.initial_state], [days], modulus)[0][0]
+
+    @classmethod
+    def query_fishes(
+            cls,
+            states: Iterable[Sequence[int]],
+            horizons: Iterable[int],
+            modulus: Optional[int] = None,
+    ) -> List[List[int]]:
+        """
+        Get the number of fishes for every pair of initial state and horizon.
+
+        States are counts of fishes by days until they next give birth. The
+        table has a row per state, and a column per horizon.
+        """
+        horizons = list(horizons)
+        if modulus is not None and modulus <= 0:
+            raise ValueError(f'Modulus must be positive, not {modulus}')
+        for days in horizons:
+            if days < 0:
+                raise ValueError(f'Horizon must not be negative, not {days}')
+        descendant_counts: List[tuple] = [
+            cls._descendants_per_fish(days, modulus) for days in horizons
+        ]
+        return [
+            [
+                cls._dot_product(state, descendants, modulus)
+                for descendants in descendant_counts
+            ]
+            for state in states
+        ]
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _descendants_per_fish(cls, days: int, modulus: Optional[int]) -> tuple:
+        """
+        Count the fishes a single fish becomes after the given number of days.
+
+        Counts are given by the fish's days until it next gives birth, and are
+        the row sums of the transition matrix raised to the number of days.
+        """
+        counts: tuple = (1,) * cls.NEWBORN_GESTATION_PERIOD
+        exponent: int = 0
+        while days:
+            if days & 1:
+                power: tuple = cls._transition_power(exponent, modulus)
+                counts = tuple(
+                    cls._dot_product(row, counts, modulus) for row in power
+                )
+            days >>= 1
+            exponent += 1
+        return counts
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _transition_power(cls, exponent: int, modulus: Optional[int]) -> tuple:
+        """Get the transition matrix raised to the power of 2 ** exponent."""
+        if exponent == 0:
+            return cls._build_transition_matrix()
+        root: tuple = cls._transition_power(exponent - 1, modulus)
+        columns: List[tuple] = list(zip(*root))
+        return tuple(
+            tuple(cls._dot_product(row, column, modulus) for column in columns)
+            for row in root
+        )
+
+    @classmethod
+    def _build_transition_matrix(cls) -> tuple:
+        """
+        Build the matrix advancing the population's state by one day.
+
+        Entry [i][j] is the number of fishes i days from giving birth which
+        become j days from giving birth on the next day.
+        """
+        size: int = cls.NEWBORN_GESTATION_PERIOD
+        matrix: List[list] = [[0] * size for _ in range(size)]
+        for days_till_birth in range(1, size):
+            matrix[days_till_birth][days_till_birth - 1] = 1
+        matrix[0][cls.REGULAR_GESTATION_PERIOD - 1] = 1
+        matrix[0][size - 1] = 1
+        return tuple(tuple(row) for row in matrix)
+
+    @staticmethod
+    def _dot_product(
+            left: Sequence[int],
+            right: Sequence[int],
+            modulus: Optional[int],
+    ) -> int:
+        """Get the dot product of two vectors, reduced by the modulus."""
+        product: int = sum(map(mul, left, right))
+        return product % modulus if modulus else product
 
     def fishes_after_n_days(self, days: int) -> int:
         """Get the number of fishes after the given number of days."""
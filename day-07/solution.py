@@ -1,6 +1,10 @@
+from bisect import bisect_left
 from functools import partial, reduce
+from itertools import accumulate, repeat
+from math import comb
+from operator import add, floordiv, mul, sub
 from statistics import mean
-from typing import List
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 
 def extract_data(path: str) -> List[int]:
@@ -30,5 +34,262 @@ def calculate_minimum_fuel(positions: List[int]) -> int:
     return reduced
 
 
+class PolynomialCost:
+
+    """A fuel cost which is a polynomial in the distance travelled."""
+
+    def __init__(self, coefficients: Sequence[int], divisor: int = 1):
+        """
+        Set the coefficients, from the constant term upwards.
+
+        The divisor must divide the polynomial exactly at every distance, so
+        summing the cost per crab matches dividing the summed polynomial.
+        """
+        self.coefficients: Tuple[int, ...] = tuple(coefficients)
+        self.divisor: int = divisor
+        if divisor < 1:
+            raise ValueError(f'Divisor must be positive, not {divisor}')
+        # Integer polynomials repeat modulo the divisor every divisor steps
+        for distance in range(divisor):
+            if self._undivided(distance) % divisor:
+                raise ValueError(
+                    f'Divisor {divisor} does not divide the cost at '
+                    f'distance {distance}'
+                )
+
+    def __call__(self, distance: int) -> int:
+        """Calculate the fuel to travel the given distance."""
+        return self._undivided(distance) // self.divisor
+
+    @property
+    def is_convex(self) -> bool:
+        """Whether the cost is known to be convex and non decreasing."""
+        # Holds for any constant term when the other coefficients are not negative
+        return all(coefficient >= 0 for coefficient in self.coefficients[1:])
+
+    def _undivided(self, distance: int) -> int:
+        """Calculate the polynomial at the distance, before the divisor."""
+        return sum(
+            coefficient * distance ** power
+            for power, coefficient in enumerate(self.coefficients)
+        )
+
+
+class ConvexCost:
+
+    """A fuel cost which is any convex, non decreasing function of distance."""
+
+    is_convex = True
+
+    def __init__(self, function: Callable[[int], int]):
+        """Set the function giving the fuel to travel a distance."""
+        self.function: Callable[[int], int] = function
+
+    def __call__(self, distance: int) -> int:
+        """Calculate the fuel to travel the given distance."""
+        return self.function(distance)
+
+
+class FuelOptimizer:
+
+    """
+    Exact fuel optimisation over a histogram of crab positions.
+
+    Running totals of the crab counts and positions give the fuel needed to
+    reach any target in constant time, so only a handful of candidate
+    targets need evaluating.
+    """
+
+    LINEAR_COST = PolynomialCost((0, 1))
+    TRIANGULAR_COST = PolynomialCost((0, 1, 1), divisor=2)
+
+    def __init__(self, positions: Iterable[int]):
+        """Build the histogram of positions and its running totals."""
+        # Taken once, as the bounds need a pass before the histogram's
+        positions = list(positions)
+        self.low: int = min(positions)
+        self.high: int = max(positions)
+        span: range = range(self.low, self.high + 1)
+        self.histogram: List[int] = [0] * len(span)
+        for position in positions:
+            self.histogram[position - self.low] += 1
+        position_sums: List[int] = list(map(mul, self.histogram, span))
+        self.prefix_counts: List[int] = list(accumulate(self.histogram))
+        self.prefix_sums: List[int] = list(accumulate(position_sums))
+        self.total_count: int = self.prefix_counts[-1]
+        self.total_sum: int = self.prefix_sums[-1]
+        self.total_square_sum: int = sum(map(mul, position_sums, span))
+        # Running totals of count * position ** power, keyed by power
+        self.prefix_moments: Dict[int, List[int]] = {
+            0: self.prefix_counts,
+            1: self.prefix_sums,
+        }
+
+    def linear_fuel(self, target: int) -> int:
+        """Calculate the fuel for all crabs to reach the target, a unit a step."""
+        below_count, below_sum = self._totals_up_to(target)
+        above_count: int = self.total_count - below_count
+        above_sum: int = self.total_sum - below_sum
+        return (
+            target * below_count - below_sum
+            + above_sum - target * above_count
+        )
+
+    def triangular_fuel(self, target: int) -> int:
+        """Calculate the fuel for all crabs to reach the target, rising a step."""
+        # Each crab spends (d ** 2 + d) / 2 fuel to travel a distance d
+        squared_distances: int = (
+            self.total_square_sum
+            - 2 * target * self.total_sum
+            + target * target * self.total_count
+        )
+        return (squared_distances + self.linear_fuel(target)) // 2
+
+    def optimise_linear(self) -> Tuple[int, int]:
+        """Find the target needing the least linear fuel, and that fuel."""
+        # The median, with at most half the crabs either side of it
+        index: int = bisect_left(self.prefix_counts, (self.total_count + 1) // 2)
+        target: int = self.low + index
+        return target, self.linear_fuel(target)
+
+    def optimise_triangular(self) -> Tuple[int, int]:
+        """Find the target needing the least triangular fuel, and that fuel."""
+        # The optimum lies within half a position of the mean
+        mean_position: int = self.total_sum // self.total_count
+        candidates: range = range(
+            max(self.low, mean_position - 1),
+            min(self.high, mean_position + 2) + 1,
+        )
+        fuel, target = min(
+            (self.triangular_fuel(target), target) for target in candidates
+        )
+        return target, fuel
+
+    def cost_curve(
+            self,
+            cost: Union[PolynomialCost, ConvexCost],
+            targets: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        """
+        Calculate the fuel needed to reach each of the targets.
+
+        Targets default to every position from the lowest crab to the highest.
+        Polynomial costs are expanded binomially over running totals of the
+        positions' powers, evaluated across all the targets at once. Other convex costs
+        are tabulated once by distance, then each target is a dot product of
+        the histogram with a window of that table.
+        """
+        if targets is None:
+            targets = range(self.low, self.high + 1)
+        targets = list(targets)
+        if isinstance(cost, PolynomialCost):
+            return self._polynomial_curve(cost, targets)
+        span: int = max([self.high, *targets]) - min([self.low, *targets])
+        # costs_by_offset[span + d] is the fuel to travel a distance of |d|
+        costs_by_offset: List[int] = [
+            cost(abs(offset)) for offset in range(-span, span + 1)
+        ]
+        return [
+            sum(map(
+                mul,
+                self.histogram,
+                costs_by_offset[span + self.low - target:],
+            ))
+            for target in targets
+        ]
+
+    def optimise(self, cost: Union[PolynomialCost, ConvexCost]) -> Tuple[int, int]:
+        """
+        Find the target needing the least fuel for a cost, and that fuel.
+
+        Targets lie between the lowest and highest crab. For convex costs the
+        total fuel is convex in the target, so the optimum is found with a
+        binary search for the first target where the fuel stops falling.
+        Other costs scan the whole cost curve.
+        """
+        low, high = self.low, self.high
+        if not cost.is_convex:
+            fuel, target = min(zip(self.cost_curve(cost), range(low, high + 1)))
+            return target, fuel
+        while low < high:
+            middle: int = (low + high) // 2
+            here, after = self.cost_curve(cost, (middle, middle + 1))
+            if after < here:
+                low = middle + 1
+            else:
+                high = middle
+        return low, self.cost_curve(cost, (low,))[0]
+
+    def _polynomial_curve(self, cost: PolynomialCost, targets: List[int]) -> List[int]:
+        """
+        Calculate the fuel for all crabs to reach each of the targets.
+
+        A crab at p spends sum(c_k * (t - p) ** k) below the target t, and
+        sum(c_k * (p - t) ** k) above it. Expanding binomially, the running
+        total of count * p ** m on each side is multiplied by a polynomial in
+        t. Each is evaluated across all the targets at once.
+        """
+        indices: List[int] = list(map(sub, targets, repeat(self.low)))
+        within_crabs: bool = not targets or (
+            self.low <= min(targets) and max(targets) <= self.high
+        )
+        if not within_crabs:
+            # Targets beyond the highest crab have every crab below them
+            last_index: int = len(self.histogram) - 1
+            indices = [min(index, last_index) for index in indices]
+        fuels: List[int] = [0] * len(targets)
+        for moment_power in range(len(cost.coefficients)):
+            prefix_moment: List[int] = self._prefix_moment(moment_power)
+            total: int = prefix_moment[-1]
+            if within_crabs:
+                below: List[int] = list(map(prefix_moment.__getitem__, indices))
+            else:
+                below = [
+                    prefix_moment[index] if index >= 0 else 0 for index in indices
+                ]
+            above: List[int] = list(map(sub, repeat(total), below))
+            # Coefficients of t ** (k - m) multiplying each side, highest first
+            sign: int = (-1) ** moment_power
+            below_terms: List[int] = []
+            above_terms: List[int] = []
+            for power in range(len(cost.coefficients) - 1, moment_power - 1, -1):
+                term: int = sign * cost.coefficients[power] * comb(power, moment_power)
+                below_terms.append(term)
+                above_terms.append(term * (-1) ** power)
+            fuels = list(map(
+                add,
+                fuels,
+                map(add,
+                    map(mul, below, _evaluate_polynomial(below_terms, targets)),
+                    map(mul, above, _evaluate_polynomial(above_terms, targets))),
+            ))
+        return list(map(floordiv, fuels, repeat(cost.divisor)))
+
+    def _prefix_moment(self, power: int) -> List[int]:
+        """Get the running totals of count * position ** power."""
+        if power not in self.prefix_moments:
+            span: range = range(self.low, self.high + 1)
+            self.prefix_moments[power] = list(accumulate(map(
+                mul, self.histogram, map(pow, span, repeat(power))
+            )))
+        return self.prefix_moments[power]
+
+    def _totals_up_to(self, target: int) -> Tuple[int, int]:
+        """Get the count and sum of the positions at or below the target."""
+        index: int = target - self.low
+        if index < 0:
+            return 0, 0
+        index = min(index, len(self.histogram) - 1)
+        return self.prefix_counts[index], self.prefix_sums[index]
+
+
+def _evaluate_polynomial(coefficients: List[int], points: List[int]) -> List[int]:
+    """Evaluate a polynomial at every point, coefficients highest power first."""
+    values: List[int] = [coefficients[0]] * len(points)
+    for coefficient in coefficients[1:]:
+        values = list(map(add, map(mul, values, points), repeat(coefficient)))
+    return values
+
+
 data = extract_data('input_data.txt')
 print(calculate_minimum_fuel(data))
\ No newline at end of file
@@ -1,4 +1,7 @@
-from typing import Dict, List
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 class SignalDecoder:
@@ -16,11 +19,79 @@ class SignalDecoder:
         SEVEN_SEGMENT_COUNT: 7,
         EIGHT_SEGMENT_COUNT: 8,
     }
+    SEGMENT_BITS: Dict[str, int] = {
+        segment: 1 << index for index, segment in enumerate('abcdefg')
+    }
+    # Summing, over a digit's segments, the number of the ten digits lit by
+    # each segment gives a total unique to the digit, whatever the wiring
+    SIGNATURE_DIGIT_MAP: Dict[int, int] = {
+        42: 0,
+        17: 1,
+        34: 2,
+        39: 3,
+        30: 4,
+        37: 5,
+        41: 6,
+        25: 7,
+        49: 8,
+        45: 9,
+    }
+    CHUNK_SIZE = 64 * 1024 * 1024
 
     def __init__(self, path: str):
-        """Extract the raw dara from the given path."""
-        with open(path, 'r') as infile:
-            self.raw_data: list = infile.readlines()
+        """Set the path to the raw data."""
+        self.path: str = path
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+
+    @cached_property
+    def raw_data(self) -> list:
+        """Extract the raw dara from the path."""
+        with open(self.path, 'r') as infile:
+            return infile.readlines()
+
+    def summarise(
+            self,
+            chunk_size: int = CHUNK_SIZE,
+            max_workers: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """
+        Get the sum of readings and count of unique segment digits.
+
+        Both come from one streaming pass over the file. Files larger than the
+        chunk size are split into line aligned chunks, which are decoded in a
+        process pool.
+        """
+        file_size: int = os.path.getsize(self.path)
+        starts: range = range(0, file_size, chunk_size)
+        ends: list = [min(start + chunk_size, file_size) for start in starts]
+        paths: list = [self.path] * len(starts)
+        if len(starts) > 1:
+            with ProcessPoolExecutor(max_workers) as executor:
+                summaries: list = list(
+                    executor.map(_summarise_chunk, paths, starts, ends)
+                )
+        else:
+            summaries = list(map(_summarise_chunk, paths, starts, ends))
+        readings, unique_segment_counts, hits, misses = map(sum, zip(*summaries))
+        self.cache_hits += hits
+        self.cache_misses += misses
+        return readings, unique_segment_counts
+
+    @classmethod
+    def summarise_rows(cls, rows: Iterable[str]) -> Tuple[int, int]:
+        """Get the sum of readings and count of unique segment digits."""
+        readings: int = 0
+        unique_segment_counts: int = 0
+        for row in rows:
+            if not row.strip():
+                continue
+            readings += cls.decode_row(row)
+            _, reading = row.split(" | ")
+            unique_segment_counts += sum(
+                1 for digit in reading.split() if len(digit) in cls.UNIQUE_SEGMENT_MAP
+            )
+        return readings, unique_segment_counts
 
     def parse_readings(self) -> List[int]:
         """Get a list of readings from the source data"""
@@ -34,6 +105,46 @@ class SignalDecoder:
             readings.append(reading)
         return sum(readings)
 
+    def parse_readings_by_signature(self) -> int:
+        """Get the sum of readings, decoding digits by their signatures."""
+        return sum(self.decode_row(row) for row in self.raw_data)
+
+    @classmethod
+    def decode_row(cls, row: str) -> int:
+        """Decode a row's reading from the signatures of its ten digits."""
+        zero_to_ten, reading = row.split(" | ")
+        # Sorting gives the same key for any ordering of the same wiring
+        masks: tuple = tuple(sorted(map(cls._to_mask, zero_to_ten.split())))
+        digits_by_mask: Dict[int, int] = cls._solve_wiring(masks)
+        reading_number: int = 0
+        for digit in reading.split():
+            reading_number = reading_number * 10 + digits_by_mask[cls._to_mask(digit)]
+        return reading_number
+
+    @staticmethod
+    @lru_cache(maxsize=5040)
+    def _solve_wiring(masks: Tuple[int, ...]) -> Dict[int, int]:
+        """
+        Map the masks of a wiring's ten digits to the digits they show.
+
+        There are only 5040 possible wirings, so solutions are cached.
+        """
+        segment_counts: List[int] = [
+            sum(mask >> segment & 1 for mask in masks) for segment in range(7)
+        ]
+        return {
+            mask: SignalDecoder.SIGNATURE_DIGIT_MAP[sum(
+                count for segment, count in enumerate(segment_counts)
+                if mask >> segment & 1
+            )]
+            for mask in masks
+        }
+
+    @classmethod
+    def _to_mask(cls, digit: str) -> int:
+        """Convert a digit's segments to a 7 bit mask."""
+        return sum(map(cls.SEGMENT_BITS.__getitem__, digit))
+
     def get_unique_segment_counts(self) -> int:
         """Retrun count of readings with uniquely IDable segments counts."""
         unique_segment_counts = 0
@@ -178,5 +289,39 @@ class SignalDecoder:
         return next(digit for digit in potentials if subset.issubset(digit))
 
 
-print(SignalDecoder('input_data.txt').parse_readings())
-print(SignalDecoder('input_data.txt').get_unique_segment_counts())
\ No newline at end of file
+def _summarise_chunk(path: str, start: int, end: int) -> Tuple[int, int, int, int]:
+    """
+    Summarise the rows starting within the given byte range of a file.
+
+    Also returns the wiring cache's hits and misses over the chunk.
+    """
+    cache_before = SignalDecoder._solve_wiring.cache_info()
+    rows: Iterator[str] = _read_chunk_rows(path, start, end)
+    readings, unique_segment_counts = SignalDecoder.summarise_rows(rows)
+    cache_after = SignalDecoder._solve_wiring.cache_info()
+    return (
+        readings,
+        unique_segment_counts,
+        cache_after.hits - cache_before.hits,
+        cache_after.misses - cache_before.misses,
+    )
+
+
+def _read_chunk_rows(path: str, start: int, end: int) -> Iterator[str]:
+    """Lazily read the rows starting within the given byte range of a file."""
+    with open(path, 'rb') as infile:
+        # Skip to the first row starting at or after the range's start
+        if start:
+            infile.seek(start - 1)
+            infile.readline()
+        while infile.tell() < end:
+            row: bytes = infile.readline()
+            if not row:
+                break
+            yield row.decode()
+
+
+if __name__ == '__main__':
+    readings, unique_segment_counts = SignalDecoder('input_data.txt').summarise()
+    print(readings)
+    print(unique_segment_counts)
\ No newline at end of file
@@ -1,20 +1,28 @@
-from functools import cached_property, lru_cache
+import mmap
+import re
+from bisect import bisect_left, insort
+from functools import cached_property
+from heapq import heappush, heapreplace
+from itertools import compress
 from math import prod
-from typing import List, Optional, Tuple
+from operator import lt
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 class SmokeFlowModel:
 
     """Class for modeeling smoke flows and associated risk."""
 
+    # Runs of points which are not the highest, and so belong to a basin
+    BASIN_RUN_PATTERN = re.compile(rb'[^9]+')
+    # Pads the edges of the map, being higher than any height's character
+    PADDING = b'\xff'
+
     def __init__(self, infile_path):
         """Read, manipulate and cache the source data."""
-        self.basin_data: dict = {}
-        with open(infile_path, 'r') as infile:
-            self.height_data: List[str] = [
-                [int(char) for char in row.strip()]
-                for row in infile.readlines()
-            ]
+        # Heights are kept as rows of their characters, a byte a point
+        with open(infile_path, 'rb') as infile:
+            self.height_rows: List[bytes] = infile.read().split()
 
     @cached_property
     def low_points(self) -> List[tuple]:
@@ -26,102 +34,570 @@ class SmokeFlowModel:
         total_risk: int = self._get_total_risk_level(self.low_points)
         return total_risk
 
-    def calculate_basin_sizes(self) -> int:
-        """Calculate the size of low point basins."""
-        basin_values: List[int] = []
-        for x, y in self.low_points:
-            value: int = self.height_data[y][x]
-            self.basin_data[(x, y)] = True
-            basin: int = self._calculate_basin(value, y, x)
-            basin_values.append(basin)
-        top_3: List[int] = sorted(basin_values, reverse=True)[:3]
-        return prod(top_3)
+    def calculate_basin_sizes(self, top: int = 3) -> Tuple[List[int], int]:
+        """
+        Calculate the size of every basin, and the product of the largest.
+
+        Sizes are given largest first.
+        """
+        basin_sizes: List[int] = sorted(
+            self._label_basins(self.height_rows), reverse=True
+        )
+        return basin_sizes, prod(basin_sizes[:top])
 
     def _find_low_points(self) -> List[tuple]:
         """Find the low points from height data."""
-        low_points = []
-        for row_index, row in enumerate(self.height_data):
-            for column_index, point in enumerate(row):
-                is_low: bool = self._is_low_point(point, row_index, column_index)
-                if is_low:
-                    low_points.append((column_index, row_index))
+        padding_row: bytes = self.PADDING * len(self.height_rows[0])
+        return self._find_band_low_points(
+            0, self.height_rows, padding_row, padding_row
+        )
+
+    def _find_band_low_points(
+            self,
+            band_start: int,
+            rows: List[bytes],
+            above: bytes,
+            below: bytes,
+    ) -> List[tuple]:
+        """Find the low points in a band of rows, given the rows around it."""
+        padded_rows: List[bytes] = [above, *rows, below]
+        low_points: List[tuple] = []
+        for row_index, row in enumerate(rows):
+            above, below = padded_rows[row_index], padded_rows[row_index + 2]
+            for column_index in self._find_row_low_points(above, row, below):
+                low_points.append((column_index, band_start + row_index))
         return low_points
 
-    def _get_total_risk_level(self, low_points: List[int]) -> int:
+    def _find_row_low_points(
+            self,
+            above: bytes,
+            row: bytes,
+            below: bytes,
+    ) -> List[int]:
+        """
+        Find the columns of a row lower than all of their adjacent points.
+
+        The row is compared with copies of itself shifted left and right,
+        and the rows above and below, a whole row at a time.
+        """
+        left: bytes = self.PADDING + row[:-1]
+        right: bytes = row[1:] + self.PADDING
+        lowest_adjacent = map(min, above, right, below, left)
+        is_low = map(lt, row, lowest_adjacent)
+        return list(compress(range(len(row)), is_low))
+
+    def _get_total_risk_level(self, low_points: List[tuple]) -> int:
         """Determing the total risk level given a set of low points."""
+        return self._get_band_risk_level(low_points, self.height_rows, 0)
+
+    def _get_band_risk_level(
+            self,
+            low_points: List[tuple],
+            rows: List[bytes],
+            band_start: int,
+    ) -> int:
+        """Determine the total risk level of low points in a band of rows."""
         RISK_LEVEL_ADJUSTMENT = 1
-        low_point_values: List[int] = [
-            self.height_data[y][x]
+        low_point_characters: int = sum(
+            rows[y - band_start][x]
             for x, y in low_points
+        )
+        height_offset: int = ord('0') - RISK_LEVEL_ADJUSTMENT
+        return low_point_characters - height_offset * len(low_points)
+
+    def _label_basins(self, rows: Iterable[bytes]) -> List[int]:
+        """Find the size of each basin in a single pass over the rows."""
+        parents, run_sizes, _, _ = self._label_runs(rows)
+        basin_sizes: Dict[int, int] = {}
+        for run, size in enumerate(run_sizes):
+            root: int = self._find_root(parents, run)
+            basin_sizes[root] = basin_sizes.get(root, 0) + size
+        return list(basin_sizes.values())
+
+    def _label_runs(self, rows: Iterable[bytes]) -> Tuple[list, list, list, list]:
+        """
+        Join the runs of points in each row into basins.
+
+        Every point other than the highest is part of a basin, so each row is
+        split into runs of such points. Runs overlapping a run in the row
+        above are joined into the same basin with a union find. Returns the
+        union find's parents, the size of each run, and the (start, end, run)
+        runs of the first and last rows.
+        """
+        parents: List[int] = []
+        run_sizes: List[int] = []
+        first_runs: List[tuple] = []
+        previous_runs: List[tuple] = []
+        for row_index, row in enumerate(rows):
+            runs: List[tuple] = []
+            for match in self.BASIN_RUN_PATTERN.finditer(row):
+                run: int = len(parents)
+                parents.append(run)
+                run_sizes.append(match.end() - match.start())
+                runs.append((match.start(), match.end(), run))
+            self._join_overlapping_runs(parents, previous_runs, runs)
+            previous_runs = runs
+            if row_index == 0:
+                first_runs = runs
+        return parents, run_sizes, first_runs, previous_runs
+
+    def _join_overlapping_runs(
+            self,
+            parents: List[int],
+            upper_runs: List[tuple],
+            lower_runs: List[tuple],
+    ) -> None:
+        """Join the basins of runs in adjacent rows which overlap."""
+        upper_index, lower_index = 0, 0
+        while upper_index < len(upper_runs) and lower_index < len(lower_runs):
+            upper_start, upper_end, upper_run = upper_runs[upper_index]
+            lower_start, lower_end, lower_run = lower_runs[lower_index]
+            if upper_start < lower_end and lower_start < upper_end:
+                upper_root: int = self._find_root(parents, upper_run)
+                lower_root: int = self._find_root(parents, lower_run)
+                parents[max(upper_root, lower_root)] = min(upper_root, lower_root)
+            if upper_end < lower_end:
+                upper_index += 1
+            else:
+                lower_index += 1
+
+    def _find_root(self, parents: List[int], run: int) -> int:
+        """Find the run representing a run's basin, halving paths on the way."""
+        while parents[run] != run:
+            parents[run] = parents[parents[run]]
+            run = parents[run]
+        return run
+
+
+class BandedSmokeFlowModel(SmokeFlowModel):
+
+    """
+    Smoke flow model for height maps larger than memory.
+
+    The height map file is memory mapped and processed in bands of rows, so
+    only one band is ever held as bytes. Low points are found with a one row
+    halo either side of the band. Basins are labeled within each band, then
+    stitched to those of the band above by their overlapping edge runs.
+    """
+
+    BAND_ROWS = 4096
+
+    def __init__(self, infile_path, band_rows: int = BAND_ROWS):
+        """Measure the height map without reading it."""
+        self.infile_path = infile_path
+        self.band_rows: int = band_rows
+        with open(infile_path, 'rb') as infile:
+            first_row: bytes = infile.readline()
+            file_size: int = infile.seek(0, 2)
+        self.width: int = len(first_row.rstrip())
+        # Bytes from the start of one row to the next, including line endings
+        self.row_stride: int = len(first_row)
+        # The last row may be missing its line ending
+        line_ending: int = self.row_stride - self.width
+        self.height: int = (file_size + line_ending) // self.row_stride
+
+    def calculate_risk(self) -> int:
+        """Calculate the total risk for the model's height data."""
+        total_risk: int = 0
+        for band_start, rows, above, below in self._iter_bands():
+            low_points: List[tuple] = self._find_band_low_points(
+                band_start, rows, above, below
+            )
+            total_risk += self._get_band_risk_level(low_points, rows, band_start)
+        return total_risk
+
+    def calculate_basin_sizes(self, top: int = 3) -> Tuple[List[int], int]:
+        """
+        Calculate the size of every basin, and the product of the largest.
+
+        Sizes are given largest first. Holding every size, memory grows with
+        the number of basins; calculate_largest_basin_sizes does not.
+        """
+        basin_sizes: List[int] = sorted(self._stitch_basin_sizes(), reverse=True)
+        return basin_sizes, prod(basin_sizes[:top])
+
+    def calculate_largest_basin_sizes(self, top: int = 3) -> Tuple[List[int], int]:
+        """
+        Calculate the sizes of the largest basins, and their product.
+
+        Sizes are given largest first. Only the largest `top` sizes are kept,
+        so memory is bounded by the band rather than the number of basins.
+        """
+        basin_sizes: List[int] = sorted(self._stitch_basin_sizes(top), reverse=True)
+        return basin_sizes, prod(basin_sizes)
+
+    def _stitch_basin_sizes(self, top: Optional[int] = None) -> List[int]:
+        """
+        Find basin sizes, stitching each band's basins to the band above's.
+
+        Basins leave the stitched union find once no run on a band's last row
+        belongs to them. Their sizes are kept in a heap of the largest `top`,
+        or all of them when no limit is given.
+        """
+        largest: List[int] = []
+        parents: List[int] = []
+        sizes: List[int] = []
+        previous_runs: List[tuple] = []
+        for _, rows, _, _ in self._iter_bands():
+            band_parents, run_sizes, first_runs, last_runs = self._label_runs(rows)
+            # Give each of the band's basins an entry in the stitched union find
+            band_basins: Dict[int, int] = {}
+            for run, size in enumerate(run_sizes):
+                root: int = self._find_root(band_parents, run)
+                if root not in band_basins:
+                    band_basins[root] = len(parents)
+                    parents.append(len(parents))
+                    sizes.append(0)
+                sizes[band_basins[root]] += size
+            first_runs = self._to_basin_runs(first_runs, band_parents, band_basins)
+            self._join_overlapping_runs(parents, previous_runs, first_runs)
+            last_runs = self._to_basin_runs(last_runs, band_parents, band_basins)
+            parents, sizes, previous_runs = self._close_basins(
+                parents, sizes, last_runs, largest, top
+            )
+        self._close_basins(parents, sizes, [], largest, top)
+        return largest
+
+    def _close_basins(
+            self,
+            parents: List[int],
+            sizes: List[int],
+            open_runs: List[tuple],
+            largest: List[int],
+            top: Optional[int],
+    ) -> Tuple[List[int], List[int], List[tuple]]:
+        """
+        Tally the basins which can no longer grow into the largest sizes.
+
+        Basins with a run among the open runs may still join the next band.
+        Returns a fresh union find of just those basins, and the open runs
+        relabeled to match it.
+        """
+        root_sizes: Dict[int, int] = {}
+        for basin, size in enumerate(sizes):
+            root: int = self._find_root(parents, basin)
+            root_sizes[root] = root_sizes.get(root, 0) + size
+        open_basins: Dict[int, int] = {}
+        relabeled_runs: List[tuple] = []
+        for start, end, basin in open_runs:
+            root = self._find_root(parents, basin)
+            open_basins.setdefault(root, len(open_basins))
+            relabeled_runs.append((start, end, open_basins[root]))
+        open_sizes: List[int] = [0] * len(open_basins)
+        for root, size in root_sizes.items():
+            if root in open_basins:
+                open_sizes[open_basins[root]] = size
+            elif top is None:
+                largest.append(size)
+            elif len(largest) < top:
+                heappush(largest, size)
+            elif largest and largest[0] < size:
+                heapreplace(largest, size)
+        return list(range(len(open_basins))), open_sizes, relabeled_runs
+
+    def _to_basin_runs(
+            self,
+            runs: List[tuple],
+            band_parents: List[int],
+            band_basins: Dict[int, int],
+    ) -> List[tuple]:
+        """Relabel a band's runs with their basin in the stitched union find."""
+        return [
+            (start, end, band_basins[self._find_root(band_parents, run)])
+            for start, end, run in runs
+        ]
+
+    def iter_low_points(self) -> Iterator[tuple]:
+        """Lazily find the low points from height data, a band at a time."""
+        for band in self._iter_bands():
+            yield from self._find_band_low_points(*band)
+
+    def _find_low_points(self) -> List[tuple]:
+        """Find the low points from height data."""
+        return list(self.iter_low_points())
+
+    def _iter_bands(self) -> Iterator[Tuple[int, List[bytes], bytes, bytes]]:
+        """
+        Read the height map a band at a time.
+
+        Yields the index of the band's first row, its rows, and the rows
+        immediately above and below it, padded beyond the map's edges.
+        """
+        padding_row: bytes = self.PADDING * self.width
+        with open(self.infile_path, 'rb') as infile:
+            height_map = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        with height_map:
+            for band_start in range(0, self.height, self.band_rows):
+                band_end: int = min(band_start + self.band_rows, self.height)
+                halo_start: int = max(band_start - 1, 0)
+                halo_end: int = min(band_end + 1, self.height)
+                rows: List[bytes] = height_map[
+                    halo_start * self.row_stride:halo_end * self.row_stride
+                ].split()
+                above: bytes = padding_row
+                below: bytes = padding_row
+                if halo_start < band_start:
+                    above = rows.pop(0)
+                if halo_end > band_end:
+                    below = rows.pop()
+                yield band_start, rows, above, below
+
+
+class MutableSmokeFlowModel(SmokeFlowModel):
+
+    """
+    Smoke flow model whose heights can be updated in place.
+
+    Every point is labeled with its basin. Updating a height only rechecks
+    the low points around it, and only relabels the basins it joins or
+    splits, keeping a sorted index of basin sizes up to date.
+    """
+
+    TOP_BASINS = 3
+    HIGHEST = ord('9')
+
+    def __init__(self, infile_path):
+        """Read the source data and label every point with its basin."""
+        super().__init__(infile_path)
+        self.height_rows: List[bytearray] = [
+            bytearray(row) for row in self.height_rows
         ]
-        return sum([point + RISK_LEVEL_ADJUSTMENT for point in low_point_values])
-
-    def _calculate_basin(self, starter: int, row_index: int, column_index: int) -> int:
-        """Calculate the basin around the given point."""
-        lookups: Tuple[int] = [
-            (column_index, row_index - 1),
-            (column_index + 1, row_index),
-            (column_index, row_index + 1),
-            (column_index - 1, row_index)
+        self.low_point_set: set = set(self._find_low_points())
+        self.total_risk: int = self._get_total_risk_level(list(self.low_point_set))
+        # Basin labels by point, 0 being the highest points outside any basin
+        self.basin_labels: List[List[int]] = [
+            [0 if height == self.HIGHEST else -1 for height in row]
+            for row in self.height_rows
         ]
-        adjacent_counts: int = []
-        for lookup in lookups:
-            in_basin, height = self._check_basin_adjacent(lookup, starter)
-            if in_basin:
-                count = self._calculate_basin(height, lookup[1], lookup[0])
-                adjacent_counts.append(count)
-        return sum(adjacent_counts) + 1
-
-    def _check_basin_adjacent(self, lookup: tuple, comparator: int) -> Tuple[bool, Optional[int]]:
-        """Return the adjacent point's value, if it is part of the basin."""
-        column_index, row_index = lookup
-        value: Optional[int] = self._lookup_height(row_index, column_index)
-        is_part_of_basin: bool = (
-            value
-            and value > comparator
-            and value != 9
-        )
-        not_already_counted: bool = lookup not in self.basin_data
-        if is_part_of_basin and not_already_counted:
-            self.basin_data[lookup] = True
-            return True, value
-        else:
-            return False, None
-
-    @lru_cache
-    def _is_low_point(
+        self.basin_sizes: Dict[int, int] = {}
+        self.sorted_basin_sizes: List[int] = []
+        self.next_label: int = 1
+        for row_index, row in enumerate(self.basin_labels):
+            for column_index, label in enumerate(row):
+                if label == -1:
+                    self._add_basin(self._relabel(row_index, column_index, -1))
+        self._update_top_basin_product()
+
+    @property
+    def low_points(self) -> List[tuple]:
+        """Get the current low points, in reading order."""
+        return sorted(self.low_point_set, key=lambda point: (point[1], point[0]))
+
+    def calculate_risk(self) -> int:
+        """Calculate the total risk for the model's height data."""
+        return self.total_risk
+
+    def calculate_basin_sizes(self, top: int = TOP_BASINS) -> Tuple[List[int], int]:
+        """
+        Calculate the size of every basin, and the product of the largest.
+
+        Sizes are given largest first.
+        """
+        basin_sizes: List[int] = self.sorted_basin_sizes[::-1]
+        return basin_sizes, prod(basin_sizes[:top])
+
+    def set_height(self, row_index: int, column_index: int, height: int) -> None:
+        """Update the height at a point, and the low points and basins around it."""
+        if not 0 <= row_index < len(self.height_rows):
+            raise IndexError(f'No row {row_index} in {len(self.height_rows)} rows')
+        if not 0 <= column_index < len(self.height_rows[row_index]):
+            raise IndexError(
+                f'No column {column_index} in '
+                f'{len(self.height_rows[row_index])} columns'
+            )
+        if not 0 <= height <= self.HIGHEST - ord('0'):
+            raise ValueError(f'Height must be a single digit, not {height}')
+        old_height: int = self.height_rows[row_index][column_index]
+        new_height: int = ord('0') + height
+        if old_height == new_height:
+            return
+        affected: List[tuple] = [
+            (column_index, row_index),
+            *self._get_adjacent_points(row_index, column_index),
+        ]
+        for point in affected:
+            self._discard_low_point(point)
+        self.height_rows[row_index][column_index] = new_height
+        for point in affected:
+            self._check_low_point(point)
+        if new_height == self.HIGHEST:
+            self._split_basin(row_index, column_index)
+        elif old_height == self.HIGHEST:
+            self._join_basins(row_index, column_index)
+
+    def _get_adjacent_points(self, row_index: int, column_index: int) -> List[tuple]:
+        """Get the (x, y) points adjacent to the given indices, within the map."""
+        return [
+            (column, row)
+            for column, row in (
+                (column_index, row_index - 1),
+                (column_index + 1, row_index),
+                (column_index, row_index + 1),
+                (column_index - 1, row_index),
+            )
+            if 0 <= row < len(self.height_rows)
+            and 0 <= column < len(self.height_rows[row])
+        ]
+
+    def _discard_low_point(self, point: tuple) -> None:
+        """Remove a point from the low points, if it is one."""
+        if point in self.low_point_set:
+            self.low_point_set.remove(point)
+            self.total_risk -= self._get_total_risk_level([point])
+
+    def _check_low_point(self, point: tuple) -> None:
+        """Add a point to the low points, if it is lower than its neighbours."""
+        column_index, row_index = point
+        height: int = self.height_rows[row_index][column_index]
+        adjacent_heights: List[int] = [
+            self.height_rows[row][column]
+            for column, row in self._get_adjacent_points(row_index, column_index)
+        ]
+        if all(height < adjacent for adjacent in adjacent_heights):
+            self.low_point_set.add(point)
+            self.total_risk += self._get_total_risk_level([point])
+
+    def _split_basin(self, row_index: int, column_index: int) -> None:
+        """
+        Relabel the pieces a basin may be split into by raising a point.
+
+        Only pieces cut off from the rest of the basin are relabeled, the
+        largest piece keeping the old label and most of the basin untouched.
+        """
+        old_label: int = self.basin_labels[row_index][column_index]
+        self.basin_labels[row_index][column_index] = 0
+        remaining_size: int = self._remove_basin(old_label) - 1
+        starts: List[tuple] = [
+            (column, row)
+            for column, row in self._get_adjacent_points(row_index, column_index)
+            if self.basin_labels[row][column] == old_label
+        ]
+        for piece in self._find_cut_off_pieces(starts, old_label):
+            label: int = self.next_label
+            self.next_label += 1
+            for column, row in piece:
+                self.basin_labels[row][column] = label
+            self._add_basin((label, len(piece)))
+            remaining_size -= len(piece)
+        if remaining_size:
+            self._add_basin((old_label, remaining_size))
+        self._update_top_basin_product()
+
+    def _find_cut_off_pieces(self, starts: List[tuple], label: int) -> List[List[tuple]]:
+        """
+        Find the points of each piece of a basin cut off from the rest.
+
+        A search runs from each start in lockstep, a point a turn. Searches
+        meeting one another are merged, and a search running out of points
+        has found a whole piece. Searching stops once at most one remains,
+        that being the piece left with the basin's label, so the work is
+        proportional to the smaller pieces rather than the whole basin.
+        """
+        # Union find of the searches which have met, keyed by search index
+        searches: List[int] = list(range(len(starts)))
+        owners: Dict[tuple, int] = {start: search for search, start in enumerate(starts)}
+        frontiers: List[List[tuple]] = [[start] for start in starts]
+        reached: List[List[tuple]] = [[start] for start in starts]
+        active: set = set(searches)
+        pieces: List[List[tuple]] = []
+        while len(active) > 1:
+            for search in list(active):
+                if len(active) <= 1:
+                    break
+                if search not in active:
+                    continue
+                if not frontiers[search]:
+                    active.remove(search)
+                    pieces.append(reached[search])
+                    continue
+                column, row = frontiers[search].pop()
+                for point in self._get_adjacent_points(row, column):
+                    if self.basin_labels[point[1]][point[0]] != label:
+                        continue
+                    owner: Optional[int] = owners.get(point)
+                    if owner is None:
+                        owners[point] = search
+                        frontiers[search].append(point)
+                        reached[search].append(point)
+                        continue
+                    other: int = self._find_root(searches, owner)
+                    if other != search:
+                        searches[other] = search
+                        frontiers[search].extend(frontiers[other])
+                        reached[search].extend(reached[other])
+                        frontiers[other], reached[other] = [], []
+                        active.discard(other)
+        return pieces
+
+    def _join_basins(self, row_index: int, column_index: int) -> None:
+        """Merge the basins around a point which has been lowered into one."""
+        adjacent_labels: set = {
+            self.basin_labels[row][column]
+            for column, row in self._get_adjacent_points(row_index, column_index)
+        } - {0}
+        if not adjacent_labels:
+            self.basin_labels[row_index][column_index] = -1
+            self._add_basin(self._relabel(row_index, column_index, -1))
+            self._update_top_basin_product()
+            return
+        # Keep the largest basin's label, relabeling only the smaller ones
+        kept_label: int = max(adjacent_labels, key=self.basin_sizes.__getitem__)
+        size: int = 1
+        for label in adjacent_labels:
+            size += self._remove_basin(label)
+        self.basin_labels[row_index][column_index] = kept_label
+        for column, row in self._get_adjacent_points(row_index, column_index):
+            label: int = self.basin_labels[row][column]
+            if label not in (0, kept_label):
+                self._relabel(row, column, label, kept_label)
+        self.basin_sizes[kept_label] = size
+        insort(self.sorted_basin_sizes, size)
+        self._update_top_basin_product()
+
+    def _relabel(
             self,
-            point: int,
             row_index: int,
-            column_index: int
-    ) -> bool:
-        """Discern whether a given point is lower than its adjacent points."""
-        adjacents: List[int] = [
-            point
-            for point in self._look_around(row_index, column_index)
-            if point is not None
-        ]
-        is_low: bool = int(point) < min(adjacents)
-        return is_low
-
-    @lru_cache
-    def _look_around(self, row_index: int, column_index: int) -> Tuple[int]:
-        """Access the elements at the point adjacent to the given indices."""
-        return (
-            self._lookup_height(row_index - 1, column_index),
-            self._lookup_height(row_index, column_index + 1),
-            self._lookup_height(row_index + 1, column_index),
-            self._lookup_height(row_index, column_index - 1),
-        )
-    def _lookup_height(self, row_index: int, column_index: int) -> Optional[int]:
-        """Look up the height at the given location, if exists"""
-        # Prevent looking up the other end of the list
-        if row_index < 0 or column_index < 0:
-            return None
-        try:
-            return self.height_data[row_index][column_index]
-        except IndexError:
-            return None
+            column_index: int,
+            from_label: int,
+            to_label: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """
+        Relabel the connected points sharing a label, from the given point.
+
+        Points get a new label unless one is given. Returns the label and the
+        number of points relabeled.
+        """
+        if to_label is None:
+            to_label = self.next_label
+            self.next_label += 1
+        self.basin_labels[row_index][column_index] = to_label
+        to_visit: List[tuple] = [(column_index, row_index)]
+        size: int = 0
+        while to_visit:
+            column, row = to_visit.pop()
+            size += 1
+            for adjacent_column, adjacent_row in self._get_adjacent_points(row, column):
+                if self.basin_labels[adjacent_row][adjacent_column] == from_label:
+                    self.basin_labels[adjacent_row][adjacent_column] = to_label
+                    to_visit.append((adjacent_column, adjacent_row))
+        return to_label, size
+
+    def _add_basin(self, basin: Tuple[int, int]) -> None:
+        """Add a labeled basin and its size to the index."""
+        label, size = basin
+        self.basin_sizes[label] = size
+        insort(self.sorted_basin_sizes, size)
+
+    def _remove_basin(self, label: int) -> int:
+        """Remove a basin from the index, returning its size."""
+        size: int = self.basin_sizes.pop(label)
+        del self.sorted_basin_sizes[bisect_left(self.sorted_basin_sizes, size)]
+        return size
+
+    def _update_top_basin_product(self) -> None:
+        """Recalculate the product of the largest basins' sizes."""
+        self.top_basin_product: int = prod(self.sorted_basin_sizes[-self.TOP_BASINS:])
+
 
 print(SmokeFlowModel('input_data.txt').calculate_risk())
-print(SmokeFlowModel('input_data.txt').calculate_basin_sizes())
\ No newline at end of file
+print(SmokeFlowModel('input_data.txt').calculate_basin_sizes()[1])
\ No newline at end of file
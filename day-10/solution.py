@@ -1,5 +1,9 @@
-from functools import reduce
-from typing import Dict, List, Optional
+import mmap
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, reduce
+from typing import Dict, Iterable, List, Optional, Tuple
 
 class BraceSyntaxError(Exception):
     """Custom exception for when a brace syntax error incurred"""
@@ -101,5 +105,136 @@ class SyntaxChecker:
         self.to_complete.append(reversed_for_closure)
 
 
-print(SyntaxChecker('input_data.txt').syntax_errors)
-print(SyntaxChecker('input_data.txt').completion_score)
\ No newline at end of file
+class StreamingSyntaxChecker:
+
+    """
+    Brace syntax checking in one streaming pass over a memory mapped file.
+
+    Rows are scanned as bytes with a plain list as the stack of expected
+    closers. Files larger than the chunk size are split into line aligned
+    chunks, which are scanned in a process pool.
+    """
+
+    CHUNK_SIZE = 64 * 1024 * 1024
+    CLOSER_CODES: Dict[int, int] = {
+        ord(opener): ord(closer)
+        for opener, closer in SyntaxChecker.CLOSER_MAP.items()
+    }
+    ERROR_POINTS_CODES: Dict[int, int] = {
+        ord(closer): points
+        for closer, points in SyntaxChecker.ERROR_POINTS_MAP.items()
+    }
+    # Completion points keyed by the closer needed, rather than the opener
+    COMPLETION_POINTS_CODES: Dict[int, int] = {
+        ord(SyntaxChecker.CLOSER_MAP[opener]): points
+        for opener, points in SyntaxChecker.COMPLETION_POINTS_MAP.items()
+    }
+
+    def __init__(
+            self,
+            path: str,
+            chunk_size: int = CHUNK_SIZE,
+            max_workers: Optional[int] = None,
+    ):
+        """Set the path to the source data, which is read lazily."""
+        self.path: str = path
+        self.chunk_size: int = chunk_size
+        self.max_workers: Optional[int] = max_workers
+
+    @property
+    def syntax_errors(self) -> int:
+        """Calculate syntax error scores."""
+        return self.scan[0]
+
+    @property
+    def completion_score(self) -> int:
+        """Calculate the completion score."""
+        scores: List[int] = self.scan[1]
+        return _select(scores, len(scores) // 2)
+
+    @cached_property
+    def scan(self) -> Tuple[int, List[int]]:
+        """Get the syntax error points and every row's completion score."""
+        file_size: int = os.path.getsize(self.path)
+        starts: range = range(0, file_size, self.chunk_size)
+        ends: list = [min(start + self.chunk_size, file_size) for start in starts]
+        paths: list = [self.path] * len(starts)
+        if len(starts) > 1:
+            with ProcessPoolExecutor(self.max_workers) as executor:
+                scans: list = list(executor.map(_scan_chunk, paths, starts, ends))
+        else:
+            scans = list(map(_scan_chunk, paths, starts, ends))
+        points: int = 0
+        completion_scores: List[int] = []
+        for chunk_points, chunk_scores in scans:
+            points += chunk_points
+            completion_scores.extend(chunk_scores)
+        return points, completion_scores
+
+    @classmethod
+    def scan_rows(cls, rows: Iterable[bytes]) -> Tuple[int, List[int]]:
+        """Get the syntax error points and completion scores of the rows."""
+        points: int = 0
+        completion_scores: List[int] = []
+        for row in rows:
+            to_be_closed: List[int] = []
+            for code in row.rstrip():
+                closer: Optional[int] = cls.CLOSER_CODES.get(code)
+                if closer is not None:
+                    to_be_closed.append(closer)
+                elif not to_be_closed or to_be_closed.pop() != code:
+                    points += cls.ERROR_POINTS_CODES[code]
+                    break
+            else:
+                if to_be_closed:
+                    score: int = 0
+                    for closer in reversed(to_be_closed):
+                        score = score * 5 + cls.COMPLETION_POINTS_CODES[closer]
+                    completion_scores.append(score)
+        return points, completion_scores
+
+
+def _scan_chunk(path: str, start: int, end: int) -> Tuple[int, List[int]]:
+    """Scan the rows starting within the given byte range of a file."""
+    with open(path, 'rb') as infile:
+        source = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    with source:
+        # Skip to the first row starting at or after the range's start
+        if start:
+            source.seek(start - 1)
+            source.readline()
+        return StreamingSyntaxChecker.scan_rows(_read_rows_until(source, end))
+
+
+def _read_rows_until(source: mmap.mmap, end: int) -> Iterable[bytes]:
+    """Lazily read rows from the source's position until the given offset."""
+    while source.tell() < end:
+        row: bytes = source.readline()
+        if not row:
+            break
+        yield row
+
+
+def _select(values: List[int], index: int) -> int:
+    """
+    Select the value which would be at the index were the values sorted.
+
+    Partitions around random pivots, taking expected linear time.
+    """
+    while True:
+        pivot: int = random.choice(values)
+        lower: List[int] = [value for value in values if value < pivot]
+        if index < len(lower):
+            values = lower
+            continue
+        equal_count: int = sum(1 for value in values if value == pivot)
+        if index < len(lower) + equal_count:
+            return pivot
+        index -= len(lower) + equal_count
+        values = [value for value in values if value > pivot]
+
+
+if __name__ == '__main__':
+    checker = StreamingSyntaxChecker('input_data.txt')
+    print(checker.syntax_errors)
+    print(checker.completion_score)
\ No newline at end of file
@@ -1,4 +1,5 @@
-from functools import reduce
+from itertools import compress, count, repeat
+from operator import add, gt
 from typing import List, Tuple
 
 
@@ -8,18 +9,43 @@ class SeaBed:
 
     FLASH_THRESHOLD_ENERGY = 9
     REGULAR_GESTATION_PERIOD = 7
+    # Energy of padding and already flashed octopuses, low enough that the
+    # increments of any number of steps never take it over the threshold
+    SPENT_ENERGY = -1 << 62
 
     def __init__(self, infile_path: str):
-        """Read the octopus data."""
+        """Read the octopus data into a flat grid padded on every side."""
         self.total_flashes: int = 0
         self.step_flashes: int = 0
-        self.just_flashed: set = set()
         with open(infile_path, 'r') as infile:
             raw_data: List[str] = infile.read().splitlines()
-            self.data: List[list] = [
-                [int(char) for char in row]
-                for row in raw_data
-            ]
+        self.height: int = len(raw_data)
+        self.width: int = len(raw_data[0])
+        stride: int = self.width + 2
+        padding_row: List[int] = [self.SPENT_ENERGY] * stride
+        self.energy: List[int] = padding_row[:]
+        for row in raw_data:
+            self.energy.append(self.SPENT_ENERGY)
+            self.energy.extend(int(char) for char in row)
+            self.energy.append(self.SPENT_ENERGY)
+        self.energy.extend(padding_row)
+        self.neighbour_offsets: Tuple[int, ...] = (
+            # Row above
+            -stride - 1, -stride, -stride + 1,
+            # Same row
+            -1, 1,
+            # Row below
+            stride - 1, stride, stride + 1,
+        )
+
+    @property
+    def data(self) -> List[List[int]]:
+        """Get the octopus energies as rows, without the padding."""
+        stride: int = self.width + 2
+        return [
+            self.energy[start:start + self.width]
+            for start in range(stride + 1, stride * (self.height + 1), stride)
+        ]
 
     def flashes_after_n_steps(self, steps: int) -> int:
         """Get the number of flashes after the given number of steps."""
@@ -29,11 +55,7 @@ class SeaBed:
 
     def get_simultaneous_flash_step(self) -> int:
         """Derive the step at which all octopuses flash at one."""
-        target: int = reduce(
-            lambda acc, curr: acc + len(curr),
-            self.data,
-            0
-        )
+        target: int = self.width * self.height
         step: int = 0
         while target != self.step_flashes:
             self.handle_step()
@@ -41,51 +63,38 @@ class SeaBed:
         return step
 
     def handle_step(self) -> None:
-        """Handle a step on the octopus population."""
-        self.step_flashes = 0
-        self.just_flashed = set()
-        for row_index, row in enumerate(self.data):
-            for column_index, _ in enumerate(row):
-                self._increment_at(row_index, column_index)
-        self.total_flashes += self.step_flashes
-
-    def _increment_at(self, row_index: int, column_index: int) -> None:
-        """Increment the valus at the given location"""
-        octopus: int = self.data[row_index][column_index]
-        if (row_index, column_index) in self.just_flashed:
-            return
-        octopus += 1
-        if octopus > 9:
-            octopus = 0
-            self.data[row_index][column_index] = octopus
-            self._handle_flash(row_index, column_index)
-            return
-        self.data[row_index][column_index] = octopus
+        """
+        Handle a step on the octopus population.
 
-    def _handle_flash(self, row_index: int, column_index: int) -> None:
-        """Handle a flash event on the surrounding octopuses."""
-        self.step_flashes += 1
-        self.just_flashed.add((row_index, column_index))
-        lookups: List[Tuple] = [
-            # Row above
-            (row_index - 1, column_index - 1),
-            (row_index - 1, column_index),
-            (row_index - 1, column_index + 1),
-            # Same row
-            (row_index, column_index - 1),
-            (row_index, column_index + 1),
-            # Row below
-            (row_index + 1, column_index - 1),
-            (row_index + 1, column_index),
-            (row_index + 1, column_index + 1),
-        ]
-        for row, column in lookups:
-            if row < 0 or column < 0:
-                continue
-            try:
-                self._increment_at(row, column)
-            except IndexError:
-                continue
+        Every octopus gains energy at once, then flashes spread in waves:
+        each wave's flashes add energy to their neighbours, and those which
+        just went over the threshold make up the next wave.
+        """
+        energy: List[int] = list(map(add, self.energy, repeat(1)))
+        wave: List[int] = list(compress(
+            count(),
+            map(gt, energy, repeat(self.FLASH_THRESHOLD_ENERGY)),
+        ))
+        flashed: List[int] = []
+        while wave:
+            flashed.extend(wave)
+            for index in wave:
+                energy[index] = self.SPENT_ENERGY
+            next_wave: List[int] = []
+            for index in wave:
+                for offset in self.neighbour_offsets:
+                    neighbour: int = index + offset
+                    neighbour_energy: int = energy[neighbour] + 1
+                    energy[neighbour] = neighbour_energy
+                    # Only the increment crossing the threshold is counted
+                    if neighbour_energy == self.FLASH_THRESHOLD_ENERGY + 1:
+                        next_wave.append(neighbour)
+            wave = next_wave
+        for index in flashed:
+            energy[index] = 0
+        self.energy = energy
+        self.step_flashes = len(flashed)
+        self.total_flashes += self.step_flashes
 
 
 bed = SeaBed('input_data.txt')